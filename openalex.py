@@ -0,0 +1,82 @@
+import os
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# load environment variables
+MAILTO = os.getenv("MAILTO")
+
+OPENALEX_WORKS = "https://api.openalex.org/works"
+
+# OpenAlex accepts up to 50 values in a single doi filter
+BATCH_SIZE = 50
+
+# a mailto in the User-Agent puts us in OpenAlex's polite pool, same as
+# with Crossref
+USER_AGENT = f"Recursive-Web-Search/1.0 (https://github.com/stefanshakeri/Recursive-Web-Search; mailto:{MAILTO})"
+
+# one pooled session for all OpenAlex calls
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = USER_AGENT
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+def reconstruct_abstract(inverted_index: dict) -> str:
+    """
+    Rebuild an abstract from OpenAlex's inverted index, which maps each
+    word to the list of positions it appears at.
+    :param inverted_index: abstract_inverted_index from an OpenAlex work
+    :return: abstract as plain text, or an empty string if unavailable
+    """
+    if not inverted_index:
+        return ""
+    words = {}
+    for word, positions in inverted_index.items():
+        for position in positions:
+            words[position] = word
+    return " ".join(words[position] for position in sorted(words))
+
+def fetch_batch(dois: list) -> list:
+    """
+    Fetch many DOIs from OpenAlex in batched /works calls. Each returned
+    entry carries the metadata fields plus the referenced works inline,
+    so references and metadata come from a single request.
+    :param dois: list of DOIs to query
+    :return: list of dictionaries with doi, title, abstract and references
+    """
+    works = []
+    for start in range(0, len(dois), BATCH_SIZE):
+        chunk = dois[start:start + BATCH_SIZE]
+        try:
+            r = SESSION.get(OPENALEX_WORKS, params={
+                "filter": "doi:" + "|".join(chunk),
+                "per-page": len(chunk),
+                "mailto": MAILTO,
+            })
+            r.raise_for_status()
+        # a failed batch only loses that chunk, not the whole query
+        except requests.exceptions.RequestException as e:
+            print(f"Warning: OpenAlex batch failed for {len(chunk)} DOIs: {e}. Skipping.")
+            continue
+
+        for work in orjson.loads(r.content).get("results", []):
+            # works without a DOI can't be matched back to the request
+            if not work.get("doi"):
+                continue
+            works.append({
+                "doi": work["doi"].replace("https://doi.org/", "").lower(),
+                "title": work.get("title") or "",
+                "abstract": reconstruct_abstract(work.get("abstract_inverted_index")),
+                # referenced_works holds OpenAlex IDs like
+                # https://openalex.org/W2741809807
+                "references": [ref.split("/")[-1] for ref in work.get("referenced_works", [])],
+            })
+    return works
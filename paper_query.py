@@ -1,8 +1,20 @@
+import asyncio
 import json
-import requests
 import os
+import re
+import sqlite3
+import time
+from collections import deque
+
+import aiohttp
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+import openalex
+
 load_dotenv()
 
 # load environment vaiables
@@ -10,6 +22,20 @@ CROSSREF = os.getenv("CROSSREF")
 KEYWORDS_STRING = os.getenv("KEYWORDS")
 MAILTO = os.getenv("MAILTO")
 
+# descriptive User-Agent with a contact address puts us in Crossref's
+# polite pool, which has better rate limits than the public one
+USER_AGENT = f"Recursive-Web-Search/1.0 (https://github.com/stefanshakeri/Recursive-Web-Search; mailto:{MAILTO})"
+
+# one pooled session for all sync Crossref calls, so keep-alive skips the
+# TCP/TLS handshake on every request after the first
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = USER_AGENT
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
 # constants
 def parse_keywords() -> list:
     """
@@ -21,6 +47,118 @@ def parse_keywords() -> list:
 
 KEYWORDS = parse_keywords()
 
+# one compiled alternation over all keywords, so relevance checks make a
+# single linear scan instead of one substring search per keyword
+KEYWORD_RE = re.compile("|".join(re.escape(k.strip()) for k in KEYWORDS), re.IGNORECASE)
+
+# maximum number of DOIs per batched /works call, kept small enough to
+# stay under the 414 URI-too-long limit
+BATCH_SIZE = 40
+
+# maximum number of in-flight Crossref requests, sized to stay polite
+CONCURRENT_REQUESTS = 16
+
+# cache of raw Crossref "message" objects keyed by lowercased DOI, so
+# references and metadata for the same DOI share a single fetch
+_works_cache = {}
+
+# on-disk cache so repeat runs skip Crossref entirely for known DOIs
+CACHE_PATH = "data/crossref_cache.sqlite"
+# entries older than 90 days are refetched
+CACHE_TTL = 90 * 24 * 3600
+
+def _open_cache() -> sqlite3.Connection:
+    """
+    Open (and create if needed) the on-disk Crossref cache.
+    :return: sqlite3 connection to the cache database
+    """
+    conn = sqlite3.connect(CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS works ("
+        "doi TEXT PRIMARY KEY, fetched_at INTEGER, json BLOB, "
+        "etag TEXT, last_modified TEXT)"
+    )
+    # upgrade cache files created before the validator columns existed
+    for column in ("etag", "last_modified"):
+        try:
+            conn.execute(f"ALTER TABLE works ADD COLUMN {column} TEXT")
+        except sqlite3.OperationalError:
+            pass
+    return conn
+
+_cache_db = _open_cache()
+
+def _cache_get(doi: str) -> dict:
+    """
+    Look up a Crossref message in the on-disk cache.
+    :param doi: DOI of the paper to look up
+    :return: cached message as a dictionary, or None if missing or expired
+    """
+    row = _cache_db.execute(
+        "SELECT fetched_at, json FROM works WHERE doi = ?", (norm(doi),)
+    ).fetchone()
+    if row is None:
+        return None
+    fetched_at, blob = row
+    # treat stale entries as misses so they get refetched
+    if time.time() - fetched_at > CACHE_TTL:
+        return None
+    return orjson.loads(blob)
+
+def _cache_get_stale(doi: str) -> tuple:
+    """
+    Look up a cache row even if it has expired, so the entry can be
+    revalidated with conditional headers instead of refetched.
+    :param doi: DOI of the paper to look up
+    :return: (message, etag, last_modified) tuple, or None if missing
+    """
+    row = _cache_db.execute(
+        "SELECT json, etag, last_modified FROM works WHERE doi = ?", (norm(doi),)
+    ).fetchone()
+    if row is None:
+        return None
+    blob, etag, last_modified = row
+    return orjson.loads(blob), etag, last_modified
+
+def _conditional_headers(stale: tuple) -> dict:
+    """
+    Build If-None-Match/If-Modified-Since headers from a stale cache row.
+    :param stale: tuple returned by _cache_get_stale, or None
+    :return: headers dictionary (possibly empty)
+    """
+    headers = {}
+    if stale is not None:
+        _, etag, last_modified = stale
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers
+
+def _cache_put(doi: str, message: dict, etag: str = None, last_modified: str = None):
+    """
+    Store a Crossref message in the on-disk cache.
+    :param doi: DOI the message belongs to
+    :param message: Crossref message to store
+    :param etag: ETag response header, if the server sent one
+    :param last_modified: Last-Modified response header, if sent
+    """
+    _cache_db.execute(
+        "INSERT OR REPLACE INTO works (doi, fetched_at, json, etag, last_modified) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (norm(doi), int(time.time()), orjson.dumps(message), etag, last_modified),
+    )
+    _cache_db.commit()
+
+def norm(doi: str) -> str:
+    """
+    Normalize a DOI for identity comparisons; Crossref returns DOIs in
+    mixed case, so the same paper can otherwise be visited twice.
+    :param doi: DOI to normalize
+    :return: stripped, lowercased DOI
+    """
+    return doi.strip().lower()
+
 def verify_status(response: requests.Response):
     """
     Verify the status of the response.
@@ -28,27 +166,38 @@ def verify_status(response: requests.Response):
     """
     print(json.dumps(response.json()["message"], indent=2))
 
-def get_references(doi: str) -> list:
+def fetch_work(doi: str) -> dict:
     """
-    Get the DOIs of papers that DOI->paper cites. 
+    Fetch the raw Crossref message for a single DOI, caching the result.
     :param doi: DOI of the paper to query
-    :return: list of DOIs that the paper cites
+    :return: Crossref message as a dictionary, or None on failure
     """
-    r = requests.get(f"{CROSSREF}/{doi}", params={"mailto": MAILTO})
-    r.raise_for_status()
-    # verify_status(r)  # uncomment to see the full response
-    references = r.json()["message"].get("reference", [])
-    return [ref["DOI"] for ref in references if ref.get("DOI")]
+    # return the cached message if we already fetched this DOI
+    cached = _works_cache.get(norm(doi))
+    if cached is not None:
+        return cached
 
-def get_metadata(doi: str) -> dict:
-    """
-    Fetch metadata for a given DOI.
-    :param doi: DOI of the paper to query
-    :return: metadata of the paper as a dictionary
-    """
-    # make a request to the CrossRef API to get the metadata for the given DOI
+    # fall back to the on-disk cache before going to the network
+    cached = _cache_get(doi)
+    if cached is not None:
+        _works_cache[norm(doi)] = cached
+        return cached
+
+    # an expired entry can still be revalidated cheaply: a 304 response
+    # confirms the cached copy without resending the body
+    stale = _cache_get_stale(doi)
+
+    # make a request to the CrossRef API for the given DOI
     try:
-        r = requests.get(f"{CROSSREF}/{doi}", params={"mailto": MAILTO})
+        r = SESSION.get(
+            f"{CROSSREF}/{doi}", params={"mailto": MAILTO},
+            headers=_conditional_headers(stale),
+        )
+        if r.status_code == 304 and stale is not None:
+            message, etag, last_modified = stale
+            _works_cache[norm(doi)] = message
+            _cache_put(doi, message, etag, last_modified)
+            return message
         r.raise_for_status()
     # handle 404 errors specifically
     except requests.exceptions.HTTPError as e:
@@ -61,15 +210,110 @@ def get_metadata(doi: str) -> dict:
     except requests.exceptions.RequestException as e:
         print(f"Warning: network error for DOI {doi}: {e}. Skipping.")
         return None
-    
-    # extract relevant metadata from the response
-    message = r.json()["message"]
+
+    # orjson decodes the large Crossref envelope noticeably faster than
+    # the stdlib json module
+    message = orjson.loads(r.content)["message"]
+    _works_cache[norm(doi)] = message
+    _cache_put(doi, message, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+    return message
+
+def _to_metadata(message: dict) -> dict:
+    """
+    Extract the metadata fields we care about from a Crossref message.
+    :param message: Crossref message as a dictionary
+    :return: metadata of the paper as a dictionary
+    """
     title = " ".join(message.get("title", []))
     abstract = message.get("abstract", "")
-    authors = message.get("author", [])
+    return {"doi": message["DOI"].lower(), "title": title, "abstract": abstract}
+
+def get_references(doi: str) -> list:
+    """
+    Get the reference entries of papers that DOI->paper cites. Each entry
+    is the raw Crossref reference dict, which often already carries an
+    article-title usable for relevance filtering.
+    :param doi: DOI of the paper to query
+    :return: list of reference dicts with a DOI
+    """
+    message = fetch_work(doi)
+    if message is None:
+        return []
+    references = message.get("reference", [])
+    return [ref for ref in references if ref.get("DOI")]
+
+def _metadata_from_reference(ref: dict) -> dict:
+    """
+    Build provisional metadata from a Crossref reference entry, or None
+    if the entry carries no title to judge relevance by.
+    :param ref: Crossref reference dict
+    :return: metadata dictionary, or None if the entry is inconclusive
+    """
+    title = ref.get("article-title", "")
+    if not title:
+        return None
+    return {"doi": ref["DOI"].lower(), "title": title, "abstract": ""}
 
-    # return the metadata as a dictionary
-    return {"doi": doi, "title": title, "abstract": abstract, "authors": authors}
+def get_metadata(doi: str) -> dict:
+    """
+    Fetch metadata for a given DOI.
+    :param doi: DOI of the paper to query
+    :return: metadata of the paper as a dictionary
+    """
+    message = fetch_work(doi)
+    if message is None:
+        return None
+    return _to_metadata(message)
+
+def get_metadata_batch(dois: list) -> dict:
+    """
+    Fetch metadata for many DOIs with batched /works calls instead of one
+    request per DOI.
+    :param dois: list of DOIs to query
+    :return: dictionary mapping lowercased DOI to metadata
+    """
+    metadata_by_doi = {}
+    # serve anything already cached and only batch-fetch the rest
+    to_fetch = []
+    for d in dois:
+        cached = _works_cache.get(norm(d)) or _cache_get(d)
+        if cached is not None:
+            _works_cache[norm(d)] = cached
+            metadata_by_doi[norm(d)] = _to_metadata(cached)
+        else:
+            to_fetch.append(d)
+
+    # OpenAlex is the primary batch backend: it takes up to 50 DOIs per
+    # filter and returns abstracts inline, where Crossref often omits them
+    for work in openalex.fetch_batch(to_fetch):
+        metadata_by_doi[work["doi"]] = {
+            "doi": work["doi"], "title": work["title"], "abstract": work["abstract"],
+        }
+    to_fetch = [d for d in to_fetch if norm(d) not in metadata_by_doi]
+
+    # fall back to Crossref for anything OpenAlex didn't return, again in
+    # chunks to keep the filter parameter a sane length
+    for start in range(0, len(to_fetch), BATCH_SIZE):
+        chunk = to_fetch[start:start + BATCH_SIZE]
+        try:
+            r = SESSION.get(CROSSREF, params={
+                "filter": ",".join(f"doi:{d}" for d in chunk),
+                "rows": len(chunk),
+                "mailto": MAILTO,
+            })
+            r.raise_for_status()
+        # a failed batch only loses that chunk, not the whole query
+        except requests.exceptions.RequestException as e:
+            print(f"Warning: batch request failed for {len(chunk)} DOIs: {e}. Skipping.")
+            continue
+
+        # index the returned works by their lowercased DOI
+        for item in orjson.loads(r.content)["message"].get("items", []):
+            _works_cache[norm(item["DOI"])] = item
+            _cache_put(item["DOI"], item)
+            metadata_by_doi[norm(item["DOI"])] = _to_metadata(item)
+
+    return metadata_by_doi
 
 
 
@@ -79,48 +323,208 @@ def is_relevant(metadata: dict) -> bool:
     :param metadata: metadata of the paper
     :return: True if the paper is relevant, False otherwise
     """
-    text = (metadata["title"] + " " + metadata["abstract"]).lower()
-    return any(key.lower() in text for key in KEYWORDS)
+    return bool(KEYWORD_RE.search(metadata["title"] + " " + metadata["abstract"]))
+
+def query_papers(doi: str, max_depth: int = 2) -> list:
+    """
+    Query papers breadth-first based on their citations and references,
+    using an explicit queue instead of recursion.
+    :param doi: DOI of the paper to start from
+    :param max_depth: Maximum depth of the search
+    :return: List of relevant papers with their metadata
+    """
+    visited = {norm(doi)}
+    results = []
+    seen_results = set()
+    frontier = deque([(norm(doi), 0)])
+
+    while frontier:
+        current, depth = frontier.popleft()
+        # get the citations for the current DOI
+        print(f"Querying DOI: {current} at depth {depth}")
+        refs = get_references(current)
+        print(f"Found {len(refs)} references for DOI: {current}")
+
+        # dedupe against visited before doing any metadata work,
+        # normalizing each DOI at ingress
+        new_refs = []
+        for ref in refs:
+            if norm(ref["DOI"]) not in visited:
+                visited.add(norm(ref["DOI"]))
+                new_refs.append(ref)
+
+        # judge relevance from the reference entry itself where it carries a
+        # title; only titleless entries need a full metadata fetch
+        decided = {}
+        inconclusive = []
+        for ref in new_refs:
+            provisional = _metadata_from_reference(ref)
+            if provisional is not None:
+                decided[norm(ref["DOI"])] = provisional if is_relevant(provisional) else None
+            else:
+                inconclusive.append(ref["DOI"])
+
+        # fetch metadata for the inconclusive references in one batched call
+        metadata_by_doi = get_metadata_batch(inconclusive)
+        for ref in new_refs:
+            next = norm(ref["DOI"])
+            if next in decided:
+                metadata = decided[next]
+            else:
+                metadata = metadata_by_doi.get(next)
+            # skip if metadata is None (e.g., DOI not found or not relevant)
+            if metadata is None:
+                continue
+
+            if is_relevant(metadata) and metadata["doi"] not in seen_results:
+                results.append(metadata)
+                seen_results.add(metadata["doi"])
+                # only expand relevant papers that are still within depth
+                if depth < max_depth:
+                    frontier.append((next, depth + 1))
+
+    return results
+
+async def fetch_work_async(session: aiohttp.ClientSession, sem: asyncio.Semaphore, doi: str) -> dict:
+    """
+    Fetch the raw Crossref message for a single DOI, caching the result.
+    :param session: aiohttp session to use
+    :param sem: semaphore bounding concurrent requests
+    :param doi: DOI of the paper to query
+    :return: Crossref message as a dictionary, or None on failure
+    """
+    # return the cached message if we already fetched this DOI
+    cached = _works_cache.get(norm(doi))
+    if cached is not None:
+        return cached
+
+    # fall back to the on-disk cache before going to the network
+    cached = _cache_get(doi)
+    if cached is not None:
+        _works_cache[norm(doi)] = cached
+        return cached
+
+    # an expired entry can still be revalidated cheaply: a 304 response
+    # confirms the cached copy without resending the body
+    stale = _cache_get_stale(doi)
+
+    try:
+        async with sem:
+            async with session.get(
+                f"{CROSSREF}/{doi}", params={"mailto": MAILTO},
+                headers=_conditional_headers(stale),
+            ) as r:
+                if r.status == 304 and stale is not None:
+                    message, etag, last_modified = stale
+                    _works_cache[norm(doi)] = message
+                    _cache_put(doi, message, etag, last_modified)
+                    return message
+                r.raise_for_status()
+                body = await r.read()
+                etag = r.headers.get("ETag")
+                last_modified = r.headers.get("Last-Modified")
+    # handle 404 errors specifically
+    except aiohttp.ClientResponseError as e:
+        if e.status == 404:
+            print(f"Warning: DOI {doi} not found (404). Skipping.")
+        else:
+            print(f"Warning: HTTP error for DOI {doi}: {e}. Skipping.")
+        return None
+    # handle other request exceptions
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Warning: network error for DOI {doi}: {e}. Skipping.")
+        return None
+
+    message = orjson.loads(body)["message"]
+    _works_cache[norm(doi)] = message
+    _cache_put(doi, message, etag, last_modified)
+    return message
 
-def query_papers(doi: str, max_depth: int = 2, depth: int = 0, visited: set = None, results: list = None, seen_results: set = None) -> list:
+async def get_references_async(session: aiohttp.ClientSession, sem: asyncio.Semaphore, doi: str) -> list:
     """
-    Recursively query papers based on their citations and references.
+    Get the reference entries of papers that DOI->paper cites.
+    :param session: aiohttp session to use
+    :param sem: semaphore bounding concurrent requests
     :param doi: DOI of the paper to query
-    :param max_depth: Maximum depth of recursion
-    :param depth: Current depth of recursion
-    :param visited: Set of visited DOIs to avoid cycles
-    :param results: List to store the results
+    :return: list of reference dicts with a DOI
+    """
+    message = await fetch_work_async(session, sem, doi)
+    if message is None:
+        return []
+    references = message.get("reference", [])
+    return [ref for ref in references if ref.get("DOI")]
+
+async def query_papers_async(doi: str, max_depth: int = 2) -> list:
+    """
+    Query papers breadth-first, fetching each level's references and
+    metadata concurrently instead of one request at a time.
+    :param doi: DOI of the paper to start from
+    :param max_depth: Maximum depth of the search
     :return: List of relevant papers with their metadata
     """
-    # Initialize visited and results if they are None
-    if visited is None:
-        visited = set()
-        results = []
-        seen_results = set()
-
-    # stop criteria
-    if depth > max_depth or doi in visited:
-        return results
-    
-    # mark the current DOI as visited
-    visited.add(doi)
-    # get the citations for the current DOI
-    print(f"Querying DOI: {doi} at depth {depth}")
-    next_dois = get_references(doi)
-    print(f"Found {len(next_dois)} references for DOI: {doi}")
-    for next in next_dois:
-        # skip if the DOI has already been visited
-        if next in visited:
-            continue
-        
-        metadata = get_metadata(next)
-        # skip if metadata is None (e.g., DOI not found)
-        if metadata is None:
-            continue
-        
-        if is_relevant(metadata) and metadata["doi"] not in seen_results:
-            results.append(metadata)
-            seen_results.add(metadata["doi"])
-            query_papers(next, max_depth, depth + 1, visited, results, seen_results)
+    visited = {norm(doi)}
+    results = []
+    seen_results = set()
+    frontier = deque([norm(doi)])
+
+    # one pooled connection per run; the semaphore keeps us inside
+    # Crossref's polite pool
+    connector = aiohttp.TCPConnector(limit_per_host=8, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=10)
+    sem = asyncio.Semaphore(CONCURRENT_REQUESTS)
+
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout, headers={"User-Agent": USER_AGENT}
+    ) as session:
+        depth = 0
+        while frontier and depth <= max_depth:
+            print(f"Querying {len(frontier)} DOIs at depth {depth}")
+            # fetch references for the whole frontier concurrently
+            ref_lists = await asyncio.gather(
+                *(get_references_async(session, sem, d) for d in frontier)
+            )
+
+            # dedupe against visited before scheduling any metadata
+            # fetches, normalizing each DOI at ingress
+            new_refs = []
+            for refs in ref_lists:
+                for ref in refs:
+                    if norm(ref["DOI"]) not in visited:
+                        visited.add(norm(ref["DOI"]))
+                        new_refs.append(ref)
+
+            # judge relevance from the reference entries where possible;
+            # only titleless entries need a metadata fetch
+            decided = {}
+            inconclusive = []
+            for ref in new_refs:
+                provisional = _metadata_from_reference(ref)
+                if provisional is not None:
+                    decided[norm(ref["DOI"])] = provisional if is_relevant(provisional) else None
+                else:
+                    inconclusive.append(ref["DOI"])
+
+            # batch the remaining metadata lookups for this level through
+            # the OpenAlex/Crossref filter backends — one request per
+            # ~50 DOIs instead of one each; the sync client runs in a
+            # worker thread so the event loop stays free
+            metadata_by_doi = await asyncio.to_thread(get_metadata_batch, inconclusive)
+
+            frontier = deque()
+            for ref in new_refs:
+                next = norm(ref["DOI"])
+                if next in decided:
+                    metadata = decided[next]
+                else:
+                    metadata = metadata_by_doi.get(next)
+                # skip if metadata is None (e.g., DOI not found or not relevant)
+                if metadata is None:
+                    continue
+
+                if is_relevant(metadata) and metadata["doi"] not in seen_results:
+                    results.append(metadata)
+                    seen_results.add(metadata["doi"])
+                    frontier.append(next)
+            depth += 1
 
     return results
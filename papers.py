@@ -1,9 +1,10 @@
+import asyncio
 import os
-from bs4 import BeautifulSoup
+from selectolax.parser import HTMLParser
 from dotenv import load_dotenv
 
-# Import the query_papers function from paper_query module
-from paper_query import query_papers
+# Import the query_papers_async function from paper_query module
+from paper_query import query_papers_async
 
 # Load environment variables
 load_dotenv()
@@ -15,7 +16,7 @@ def strip_html(text: str) -> str:
     :param text: Text containing HTML tags
     :return: Text without HTML tags
     """
-    return BeautifulSoup(text, "html.parser").get_text()
+    return HTMLParser(text).text()
 
 
 def main():
@@ -23,22 +24,27 @@ def main():
     Main function to initiate the paper querying process.
     """
     print(f"Starting query with DOI: {START_DOI}")
-    found = query_papers(START_DOI, max_depth = 1)
+    found = asyncio.run(query_papers_async(START_DOI, max_depth = 1))
     print(f"Found {len(found)} relevant papers")
 
-    # output the found papers into documents.tsv
-    with open("data/documents.tsv", "w", encoding="utf-8") as f:
-        # write the header
+    # build all output lines up front, then write each file in one go
+    rows = []
+    dois = []
+    for paper in found:
+        doi = paper["doi"]
+        title = strip_html(paper["title"].replace("\n", " "))
+        rows.append(f"https://doi.org/{doi}\t{title}\n")
+        dois.append(f"{doi}\n")
+
+    # output the found papers into documents.tsv and their DOIs into
+    # dois.txt; both files are opened once and rewritten, so DOIs no
+    # longer accumulate across runs
+    with open("data/documents.tsv", "w", encoding="utf-8") as f, \
+         open("data/dois.txt", "w", encoding="utf-8") as doi_file:
+        # write the header, then one paper per line, tab-separated
         f.write("DOI\tTitle\n")
-        # write one paper per line, tab-separated
-        for paper in found:
-            doi = paper["doi"]
-            title = strip_html(paper["title"].replace("\n", " "))
-            # add the DOI and title to the file
-            f.write(f"https://doi.org/{doi}\t{title}\n")
-            # add the doi to dois.txt
-            with open("data/dois.txt", "a", encoding="utf-8") as doi_file:
-                doi_file.write(f"{doi}\n")
+        f.writelines(rows)
+        doi_file.writelines(dois)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,167 @@
+"""
+Shared Crossref client for the grabber tools. Fetches each /works/{doi}
+response once and lets the callers extract their own fields, instead of
+every grabber issuing its own request for the same JSON.
+"""
+
+import os
+import requests
+import requests_cache
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# load environment variables
+CROSSREF = os.getenv("CROSSREF")
+MAILTO = os.getenv("MAILTO")
+
+# maximum number of DOIs per batched /works call, kept small enough to
+# stay under the 414 URI-too-long limit
+BATCH_SIZE = 20
+
+# concurrent per-DOI fallback fetches, sized to stay polite
+MAX_WORKERS = 16
+
+# on-disk cache shared by every consumer of this module: one network
+# round-trip serves authors, dates and anything else extracted from the
+# same work; 404s are cached too so known-missing DOIs aren't refetched
+SESSION = requests_cache.CachedSession(
+    "data/crossref_http_cache", backend="sqlite",
+    expire_after=86400 * 30, allowable_codes=(200, 404),
+)
+# compressed responses halve the bytes on Crossref's JSON payloads
+SESSION.headers["Accept-Encoding"] = "gzip, br"
+
+def fetch_work(index: int, total: int, doi: str) -> dict:
+    """
+    Fetch the Crossref message for a single DOI.
+
+    :param index: position of the DOI in the input list (for logging)
+    :param total: total number of DOIs being processed
+    :param doi: DOI of the paper to query
+    :return: Crossref message as a dictionary, or None on failure
+    """
+    try:
+        r = SESSION.get(f"{CROSSREF}/{doi}", params={"mailto": MAILTO}, timeout=10)
+        r.raise_for_status()
+
+    # handle exceptions
+    except requests.exceptions.HTTPError as e:
+        if r.status_code == 404:
+            print(f"[{index}/{total}] Warning: DOI {doi} not found (404). Skipping.")
+        else:
+            print(f"[{index}/{total}] Warning: HTTP error for DOI {doi}: {e}. Skipping.")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"[{index}/{total}] Warning: Request error for DOI {doi}: {e}. Skipping.")
+        return None
+
+    try:
+        return r.json()["message"]
+    except (KeyError, ValueError) as e:
+        print(f"[{index}/{total}] Warning: Error parsing response for DOI {doi}: {e}")
+        return None
+
+def fetch_crossref_batch(dois: list) -> list:
+    """
+    Fetch the Crossref messages for a list of DOIs, one entry per DOI.
+    DOIs are queried in batched /works filter calls (one round-trip per
+    BATCH_SIZE DOIs) instead of one request each; anything the batch
+    doesn't return is retried individually.
+
+    :param dois: list of DOIs to query
+    :return: list of Crossref messages, with None for DOIs that failed
+    """
+    messages = {}
+    for start in range(0, len(dois), BATCH_SIZE):
+        chunk = dois[start:start + BATCH_SIZE]
+        try:
+            r = SESSION.get(CROSSREF, params={
+                "filter": ",".join(f"doi:{doi}" for doi in chunk),
+                "rows": len(chunk),
+                "mailto": MAILTO,
+            }, timeout=30)
+            r.raise_for_status()
+            items = r.json()["message"].get("items", [])
+        # a failed batch only loses that chunk; its DOIs fall back to
+        # per-DOI fetches below
+        except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+            print(f"Warning: batch request failed for {len(chunk)} DOIs: {e}.")
+            items = []
+
+        # index the returned works by their lowercased DOI
+        for item in items:
+            messages[item["DOI"].strip().lower()] = item
+
+    # preserve input order; misses are retried individually, in parallel
+    results = [messages.get(doi.strip().lower()) for doi in dois]
+    missing = [i for i, message in enumerate(results) if message is None]
+    if missing:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            fetched = executor.map(
+                fetch_work, [i + 1 for i in missing],
+                [len(dois)] * len(missing), [dois[i] for i in missing]
+            )
+            for i, message in zip(missing, fetched):
+                results[i] = message
+    return results
+
+def get_authors(message: dict) -> str:
+    """
+    Extract the authors from a Crossref message, concatenated by ", ".
+
+    :param message: Crossref message as a dictionary, or None
+    :return: authors as a string, or "Unknown" if not found
+    """
+    if not message or not message.get("author"):
+        return "Unknown"
+
+    authors_list = []
+    for a in message["author"]:
+        # Handle cases where 'given' or 'family' might be missing
+        given = a.get('given', '')
+        family = a.get('family', '')
+
+        if given and family:
+            full_name = f"{given} {family}"
+        elif family:
+            full_name = family
+        elif given:
+            full_name = given
+        else:
+            full_name = "Unknown Author"
+
+        authors_list.append(full_name)
+
+    return ", ".join(authors_list)
+
+def get_publication(message: dict) -> str:
+    """
+    Extract the publication (journal, conference, etc.) from a Crossref
+    message.
+
+    :param message: Crossref message as a dictionary, or None
+    :return: publication as a string, or "Unknown" if not found
+    """
+    if not message:
+        return "Unknown"
+    # get the publication title if message["container-title"] exists and has elements
+    if "container-title" in message and message["container-title"]:
+        return message["container-title"][0]
+    return "Unknown"
+
+def get_date(message: dict) -> str:
+    """
+    Extract the publication year from a Crossref message.
+
+    :param message: Crossref message as a dictionary, or None
+    :return: publication year as a string, or "Unknown" if not found
+    """
+    if not message:
+        return "Unknown"
+    try:
+        date = message["issued"]["date-parts"][0]
+        return str(date[0])
+    except (KeyError, IndexError, TypeError):
+        return "Unknown"
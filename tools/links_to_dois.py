@@ -1,15 +1,12 @@
 # get doi links from doi_links.txt and convert them to dois in dois.txt
 
-def main():
-    with open("data/doi_links.txt", "r") as f:
-        doi_links = f.readlines()
-
-        # remove the "https://doi.org/" prefix and any trailing whitespace
-        dois = [link.strip().replace("https://doi.org/", "") for link in doi_links]
+from pathlib import Path
 
-        # write the cleaned DOIs into dois.txt
-        with open("data/dois.txt", "w") as wf:
-            wf.writelines("\n".join(dois))
+def main():
+    # read the whole file, strip the "https://doi.org/" prefix in one
+    # pass, and write the result back out in a single allocation
+    text = Path("data/doi_links.txt").read_text()
+    Path("data/dois.txt").write_text(text.replace("https://doi.org/", ""))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,387 +1,598 @@
+import asyncio
+# the stdlib html module gets an alias because "html" is a common local
+# variable name in the scraping functions
+import html as html_module
+import logging
 import os
+import queue
 import re
-import requests
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+
+import ahocorasick
+import aiofiles
+import aiohttp
+from collections import defaultdict
 from dotenv import load_dotenv
-from urllib.parse import urljoin, quote_plus, urlparse, parse_qs
+from urllib.parse import urljoin, quote, urlparse, parse_qs
 
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+
+import sources
 
 # load environment variables
 load_dotenv()
-UNPAYWALL_EMAIL = os.getenv("MAILTO")
 
 OUTPUT_DIR = "data/pdfs"
 INPUT_FILE = "data/dois.txt"
 
-PDF_COUNTER = 0
+# number of DOIs processed concurrently; each one is latency-bound, so
+# the event loop keeps this many in flight at once
+CONCURRENT_DOIS = 64
+
+# at most this many simultaneous downloads per publisher host, so a batch
+# of DOIs resolving to one site doesn't hammer it
+PER_HOST_DOWNLOADS = 4
+
+# semaphores created on first use per download host
+_host_sems = defaultdict(lambda: asyncio.Semaphore(PER_HOST_DOWNLOADS))
 
 # prepare output folder
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def verify_pdf_url(url: str, session: requests.Session = None) -> bool:
+# per-DOI progress goes through a queue handler so coroutines never
+# block on the stdout lock; a listener thread does the actual writes
+logger = logging.getLogger(__name__)
+
+# regexes used on every scraped page, compiled once at import
+PDF_HREF_RE = re.compile(r"\.pdf(\?|$)", re.I)
+PDF_TEXT_RE = re.compile(r"PDF", re.I)
+
+# anchor texts that usually lead to a PDF download page, fused into one
+# alternation so each anchor's text is scanned once for all of them
+PDF_KEYWORDS = [
+    "PDF", "Download PDF", "View PDF", "Full Text PDF", "Download",
+    "Full Text", "Article PDF", "Download Article", "View Article",
+    "Get PDF", "Access PDF", "Read PDF", "Open PDF"
+]
+PDF_KEYWORD_RE = re.compile("|".join(re.escape(keyword) for keyword in PDF_KEYWORDS), re.I)
+
+# href fragments that usually lead to a PDF download page, fused the
+# same way
+PDF_HREF_PATTERN_RE = re.compile(
+    r"pdf|download|fulltext|article|view.*pdf|get.*pdf|access.*pdf", re.I
+)
+
+# every tag kind that can carry a PDF reference, fused into one CSS
+# query so find_pdf_link walks the DOM once instead of once per kind
+PDF_LINK_SELECTOR = (
+    "a[href], meta[name='citation_pdf_url'], iframe[src], embed[src], "
+    "link[rel='alternate'][type='application/pdf'], [data-pdf-url]"
+)
+
+# anchors that advertise a PDF through aria-labels, classes or ids,
+# tried in priority order by find_intermediate_pdf_page
+INTERMEDIATE_SELECTORS = (
+    "a[aria-label*='PDF' i]",
+    "a[aria-label*='Download' i]",
+    "a.pdf-link",
+    "a.download-pdf",
+    "a.full-text",
+    "a[class*='pdf' i]",
+    "a[id*='pdf' i]",
+)
+
+# byte markers that identify an HTML error page posing as a PDF
+HTML_INDICATORS = (b'<!doctype', b'<html', b'<head', b'<body')
+
+# PDF URLs embedded in landing-page JSON or JavaScript
+# the five embedded-URL patterns fused into one alternation over bytes:
+# one pass of the regex engine instead of five full scans, run on the
+# raw body so a hit skips decoding the page entirely
+PDF_JSON_RE = re.compile(rb'|'.join((
+    rb'"pdfUrl"\s*:\s*"([^"]+)"',
+    rb'"pdf_url"\s*:\s*"([^"]+)"',
+    rb'"downloadUrl"\s*:\s*"([^"]+\.pdf[^"]*)"',
+    rb'pdfUrl\s*=\s*["\']([^"\']+)["\']',
+    rb'pdf_link\s*=\s*["\']([^"\']+\.pdf[^"\']*)["\']'
+)), re.I)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
+
+def _doi_suffix(doi: str) -> str:
+    """
+    Return the part of a DOI after the registrant prefix.
+    :param doi: DOI of the paper
+    :return: DOI suffix, or the whole DOI if it has no slash
+    """
+    return doi.split("/", 1)[1] if "/" in doi else doi
+
+# publishers whose DOI prefix maps deterministically to a PDF URL
+# template; a matching DOI costs one HEAD to confirm instead of the
+# whole landing-page fetch-and-parse pipeline
+_PREFIX_HANDLERS = {
+    # Nature: articles are served by their DOI suffix
+    "10.1038": lambda doi: f"https://www.nature.com/articles/{quote(_doi_suffix(doi))}.pdf",
+    # bioRxiv/medRxiv preprints share the 10.1101 prefix
+    "10.1101": lambda doi: f"https://www.biorxiv.org/content/{quote(doi, safe='/')}v1.full.pdf",
+    # ACS serves PDFs straight off the DOI
+    "10.1021": lambda doi: f"https://pubs.acs.org/doi/pdf/{quote(doi, safe='/')}",
+    # PLOS exposes a printable-file endpoint keyed by DOI
+    "10.1371": lambda doi: f"https://journals.plos.org/plosone/article/file?id={quote(doi, safe='/')}&type=printable",
+}
+
+# common PDF indicators in hrefs, matched against lowercased URLs
+PDF_INDICATORS = [
+    ".pdf", "pdfft", "/pdf/", "pdf?", "getpdf", "downloadpdf",
+    "viewpdf", "fulltext.pdf", "article.pdf", "download.pdf",
+    "content_type=pdf", "format=pdf", "type=pdf"
+]
+
+# one Aho-Corasick automaton scans a URL for all indicators in a single
+# linear pass, instead of one substring search per indicator; is_pdf_link
+# runs for every anchor on every scraped page, so this is a hot path
+_PDF_AC = ahocorasick.Automaton()
+for _indicator in PDF_INDICATORS:
+    _PDF_AC.add_word(_indicator, _indicator)
+_PDF_AC.make_automaton()
+
+# verification verdicts are persisted on disk so resumed or repeated
+# runs skip HEADs for URLs already checked; fresh entries are served
+# directly, stale ones are revalidated with a conditional HEAD that the
+# server can answer 304-with-no-body
+VERIFY_CACHE_PATH = "data/verify_cache.sqlite"
+# cached verdicts younger than this are trusted outright
+VERIFY_CACHE_TTL = 24 * 3600
+
+def _open_verify_cache() -> sqlite3.Connection:
+    """
+    Open (and create if needed) the on-disk URL-verification cache.
+    :return: sqlite3 connection to the cache database
+    """
+    conn = sqlite3.connect(VERIFY_CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS verifications ("
+        "url TEXT PRIMARY KEY, fetched_at INTEGER, is_pdf INTEGER, "
+        "etag TEXT, last_modified TEXT)"
+    )
+    return conn
+
+_verify_db = _open_verify_cache()
+
+# in-run memo in front of the on-disk cache: the same candidate URLs
+# (the common-path probes especially) recur across DOIs on the same
+# host, and a dict hit replaces a round-trip; a plain dict rather than
+# lru_cache because coroutines can't be memoized directly
+_verify_cache = {}
+
+def _verify_store(url: str, is_pdf: bool, etag: str, last_modified: str):
+    """
+    Persist a verification verdict with the response's cache validators.
+    :param url: URL the verdict belongs to
+    :param is_pdf: whether the URL serves a PDF
+    :param etag: ETag header from the response, or None
+    :param last_modified: Last-Modified header from the response, or None
+    """
+    _verify_db.execute(
+        "INSERT OR REPLACE INTO verifications "
+        "(url, fetched_at, is_pdf, etag, last_modified) VALUES (?, ?, ?, ?, ?)",
+        (url, int(time.time()), int(is_pdf), etag, last_modified),
+    )
+    _verify_db.commit()
+    _verify_cache[url] = is_pdf
+
+async def verify_pdf_url(url: str, session: aiohttp.ClientSession) -> bool:
     """
     Verify that a URL actually points to a PDF by checking headers.
+    Verdicts are memoized for the run and persisted across runs; stale
+    persisted entries are revalidated with a conditional HEAD.
     :param url: URL to verify
-    :param session: requests session to use
+    :param session: aiohttp session to use
     :return: True if URL points to a PDF, False otherwise
     """
-    session = session or requests.Session()
+    cached = _verify_cache.get(url)
+    if cached is not None:
+        return cached
+
+    row = _verify_db.execute(
+        "SELECT fetched_at, is_pdf, etag, last_modified "
+        "FROM verifications WHERE url = ?", (url,),
+    ).fetchone()
+    if row is not None:
+        fetched_at, is_pdf, etag, last_modified = row
+        if time.time() - fetched_at <= VERIFY_CACHE_TTL:
+            _verify_cache[url] = bool(is_pdf)
+            return bool(is_pdf)
+        # stale entry: if the resource is unchanged the server answers
+        # 304 and the old verdict still holds
+        if (etag or last_modified) and await _revalidate_pdf_url(
+            url, session, etag, last_modified
+        ):
+            _verify_store(url, bool(is_pdf), etag, last_modified)
+            return bool(is_pdf)
+
+    result, etag, last_modified = await _verify_pdf_url_impl(url, session)
+    if result is None:
+        # the probe itself failed; that's not a verdict, so leave both
+        # cache tiers alone and let the next call retry
+        return False
+    _verify_store(url, result, etag, last_modified)
+    return result
+
+async def _revalidate_pdf_url(url: str, session: aiohttp.ClientSession,
+                              etag: str, last_modified: str) -> bool:
+    """
+    Ask the server whether a previously verified URL is unchanged.
+    :param url: URL to revalidate
+    :param session: aiohttp session to use
+    :param etag: cached ETag to send as If-None-Match, or None
+    :param last_modified: cached Last-Modified to send as If-Modified-Since
+    :return: True if the server answered 304 Not Modified
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        async with session.head(
+            url, timeout=aiohttp.ClientTimeout(total=10),
+            allow_redirects=True, headers=headers,
+        ) as response:
+            return response.status == 304
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return False
+
+async def _verify_pdf_url_impl(url: str, session: aiohttp.ClientSession) -> tuple:
+    """
+    Do the actual header checks behind verify_pdf_url.
+    :param url: URL to verify
+    :param session: aiohttp session to use
+    :return: (is_pdf, etag, last_modified) tuple; is_pdf is None when
+        the probe failed and no verdict could be reached
+    """
+    etag = last_modified = None
     try:
         # Make a HEAD request to check content type without downloading
-        response = session.head(url, timeout=10, allow_redirects=True)
-        content_type = response.headers.get("Content-Type", "").lower()
-        
-        # Check if content type indicates PDF
-        if "application/pdf" in content_type:
-            return True
-        
-        # Some servers don't set proper content type, so check content-disposition
-        content_disposition = response.headers.get("Content-Disposition", "").lower()
-        if ".pdf" in content_disposition:
-            return True
-        
+        async with session.head(url, timeout=aiohttp.ClientTimeout(total=10), allow_redirects=True) as response:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            content_type = response.headers.get("Content-Type", "").lower()
+
+            # Check if content type indicates PDF
+            if "application/pdf" in content_type:
+                return True, etag, last_modified
+
+            # Some servers don't set proper content type, so check content-disposition
+            content_disposition = response.headers.get("Content-Disposition", "").lower()
+            if ".pdf" in content_disposition:
+                return True, etag, last_modified
+
+            status = response.status
+
         # If HEAD doesn't work, try a small GET request
-        if response.status_code != 200:
-            response = session.get(url, timeout=10, stream=True, headers={"Range": "bytes=0-1023"})
-            
+        if status != 200:
+            async with session.get(
+                url, timeout=aiohttp.ClientTimeout(total=10), headers={"Range": "bytes=0-1023"}
+            ) as response:
+                pass
+
         # Check if URL path suggests it's a PDF
         if url.lower().endswith('.pdf'):
-            return True
-            
-    except requests.exceptions.RequestException:
-        pass
-    
-    return False
+            return True, etag, last_modified
+
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        # the server never answered, so "not a PDF" would be a guess;
+        # report no verdict instead
+        return None, etag, last_modified
+
+    return False, etag, last_modified
 
+@lru_cache(maxsize=8192)
 def is_pdf_link(href: str) -> bool:
     """
-    Check if the given href points to .pdf or pdfft endpoint carrying a PDF
-    
+    Check if the given href points to .pdf or pdfft endpoint carrying a
+    PDF. Publisher pages repeat the same anchors many times, so results
+    are memoized per href.
+
     :param href: URL or path to check
     :return: True if it points to a PDF, False otherwise
     """
     if not href:
         return False
-        
+
     href_lower = href.lower()
-    
-    # Check for common PDF indicators
-    pdf_indicators = [
-        ".pdf", "pdfft", "/pdf/", "pdf?", "getPDF", "downloadPDF", 
-        "viewPDF", "fulltext.pdf", "article.pdf", "download.pdf",
-        "content_type=pdf", "format=pdf", "type=pdf"
-    ]
-    
-    if any(indicator in href_lower for indicator in pdf_indicators):
+
+    # the common positive case, decided without parsing the URL
+    if href_lower.endswith(".pdf"):
+        return True
+
+    # Check for common PDF indicators in one scan
+    for _ in _PDF_AC.iter(href_lower):
         return True
-    
+
     # parse the URL and check the path
     try:
         parsed = urlparse(href)
         path = parsed.path.lower()
-        
+
         if path.endswith(".pdf"):
             return True
-        
-        # check for query-string values as well
-        for vals in parse_qs(parsed.query).values():
-            if any(v.lower().endswith(".pdf") for v in vals):
-                return True
+
+        # check for query-string values as well, skipping the parse when
+        # there is no query at all
+        if parsed.query:
+            for vals in parse_qs(parsed.query).values():
+                if any(v.lower().endswith(".pdf") for v in vals):
+                    return True
     except Exception:
         pass
-    
+
     return False
 
-def find_pdf_link(soup: BeautifulSoup, base_url: str) -> str:
+def find_pdf_link(tree: LexborHTMLParser, base_url: str) -> str:
     """
-    Find a direct PDF link in the given BeautifulSoup object.
+    Find a direct PDF link in the given parsed HTML tree.
 
-    :param soup: BeautifulSoup object containing the HTML content
+    :param tree: LexborHTMLParser tree of the HTML content
     :param base_url: Base URL to resolve relative links
     :return: URL of the PDF if found, otherwise None
     """
-    # Priority 1: Direct PDF links in <a> tags
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        if is_pdf_link(href):
-            return urljoin(base_url, href)
-    
-    # Priority 2: Look for meta tags with PDF URLs
-    meta_pdf = soup.find("meta", attrs={"name": "citation_pdf_url"})
-    if meta_pdf and meta_pdf.get("content"):
-        return urljoin(base_url, meta_pdf["content"])
-    
-    # Priority 3: <iframe> or <embed> with PDF
-    iframe = soup.find("iframe", src=re.compile(r"\.pdf$", re.I))
-    if iframe:
-        return urljoin(base_url, iframe["src"])
-    
-    embed = soup.find("embed", src=re.compile(r"\.pdf$", re.I))
-    if embed:
-        return urljoin(base_url, embed["src"])
-    
-    # Priority 4: <link> with rel="alternate" and type="application/pdf"
-    link = soup.find("link", rel="alternate", type="application/pdf")
-    if link and link.get("href"):
-        return urljoin(base_url, link["href"])
-    
-    # Priority 5: Look for buttons/links with download attributes
-    download_link = soup.find("a", attrs={"download": True, "href": True})
-    if download_link and is_pdf_link(download_link["href"]):
-        return urljoin(base_url, download_link["href"])
-    
-    # Priority 6: Look for data attributes that might contain PDF URLs
-    for element in soup.find_all(attrs={"data-pdf-url": True}):
-        pdf_url = element.get("data-pdf-url")
-        if pdf_url and is_pdf_link(pdf_url):
-            return urljoin(base_url, pdf_url)
-    
+    # one DOM pass over every tag kind that can carry a PDF reference,
+    # instead of a separate tree walk per priority; the query returns
+    # nodes in document order, so each tier keeps its first hit in a
+    # slot and the best-filled slot wins after the walk
+    # slots: a, meta, iframe, embed, link, data-pdf-url
+    slots = [None] * 6
+    for node in tree.css(PDF_LINK_SELECTOR):
+        attrs = node.attributes
+        # direct PDF links in <a> tags (including download buttons)
+        if node.tag == "a":
+            if is_pdf_link(attrs.get("href")):
+                # nothing outranks an anchor hit, so stop the walk
+                return urljoin(base_url, attrs["href"])
+        # meta tag carrying the PDF URL
+        elif node.tag == "meta":
+            if slots[1] is None and attrs.get("content"):
+                slots[1] = attrs["content"]
+        # <iframe> or <embed> with PDF
+        elif node.tag in ("iframe", "embed"):
+            slot = 2 if node.tag == "iframe" else 3
+            src = attrs.get("src") or ""
+            if slots[slot] is None and PDF_HREF_RE.search(src):
+                slots[slot] = src
+        # <link> with rel="alternate" and type="application/pdf"
+        elif node.tag == "link":
+            if slots[4] is None and attrs.get("href"):
+                slots[4] = attrs["href"]
+        # data attributes that might contain PDF URLs
+        else:
+            pdf_url = attrs.get("data-pdf-url")
+            if slots[5] is None and pdf_url and is_pdf_link(pdf_url):
+                slots[5] = pdf_url
+
+    for candidate in slots:
+        if candidate is not None:
+            return urljoin(base_url, candidate)
     return None
 
-def find_intermediate_pdf_page(soup: BeautifulSoup) -> str: 
+def find_intermediate_pdf_page(tree: LexborHTMLParser) -> str:
     """
     Find intermediate links that lead to a PDF download page.
 
-    :param soup: BeautifulSoup object containing the HTML content
+    :param tree: LexborHTMLParser tree of the HTML content
     :return: URL of the intermediate page if found, otherwise None
     """
     # Priority 1: Look for specific PDF-related links with aria-labels or classes
-    selectors = [
-        "a[aria-label*='PDF' i]",
-        "a[aria-label*='Download' i]", 
-        "a.pdf-link",
-        "a.download-pdf",
-        "a.full-text",
-        "a[class*='pdf' i]",
-        "a[id*='pdf' i]"
+    for selector in INTERMEDIATE_SELECTORS:
+        link = tree.css_first(selector)
+        if link and link.attributes.get("href"):
+            return link.attributes["href"]
+
+    # collect the anchors once; priorities 2 and 3 both scan them
+    anchors = [
+        (node, node.attributes["href"]) for node in tree.css("a[href]")
+        if node.attributes.get("href")
     ]
-    
-    for selector in selectors:
-        link = soup.select_one(selector)
-        if link and link.get("href"):
-            return link["href"]
-    
-    # Priority 2: Look for buttons with PDF-related text
-    pdf_keywords = [
-        "PDF", "Download PDF", "View PDF", "Full Text PDF", "Download", 
-        "Full Text", "Article PDF", "Download Article", "View Article",
-        "Get PDF", "Access PDF", "Read PDF", "Open PDF"
-    ]
-    
-    for keyword in pdf_keywords:
-        # Look in link text
-        candidates = soup.find_all("a", href=True, string=re.compile(keyword, re.I))
-        if candidates:
-            return candidates[0]["href"]
-        
-        # Look in button text within links
-        button_link = soup.find("a", href=True)
-        if button_link:
-            button = button_link.find(string=re.compile(keyword, re.I))
-            if button:
-                return button_link["href"]
-    
+
+    # Priority 2: Look for links with PDF-related text
+    for node, href in anchors:
+        if PDF_KEYWORD_RE.search(node.text()):
+            return href
+
     # Priority 3: Look for links with PDF-related href patterns
-    pdf_href_patterns = [
-        r"pdf", r"download", r"fulltext", r"article", r"view.*pdf",
-        r"get.*pdf", r"access.*pdf"
-    ]
-    
-    for pattern in pdf_href_patterns:
-        pdf_link = soup.find("a", href=re.compile(pattern, re.I))
-        if pdf_link and pdf_link.get("href"):
-            return pdf_link["href"]
-    
+    for node, href in anchors:
+        if PDF_HREF_PATTERN_RE.search(href):
+            return href
+
     # Priority 4: Look for form submissions that might lead to PDFs
-    form = soup.find("form")
-    if form and form.get("action"):
-        action = form["action"].lower()
-        if any(keyword in action for keyword in ["pdf", "download", "export"]):
-            return form["action"]
-    
+    form = tree.css_first("form[action]")
+    if form:
+        action = form.attributes["action"] or ""
+        if any(keyword in action.lower() for keyword in ["pdf", "download", "export"]):
+            return action
+
     return None
 
-def web_scrape_pdfs(doi: str, session: requests.Session = None) -> str:
+async def web_scrape_pdfs(doi: str, session: aiohttp.ClientSession) -> str:
     """
-    Web scrape the PDF from the given DOI. 
+    Web scrape the PDF from the given DOI.
     :param doi: the DOI of the paper
+    :param session: aiohttp session to use
     :return: URL of the PDF if available, otherwise None
     """
-    session = session or requests.Session()
-    session.headers.update({
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
-    })
+    # Method 0: known publisher prefixes map straight to a PDF URL
+    # template; one HEAD confirms it and skips the generic pipeline
+    handler = _PREFIX_HANDLERS.get(doi.split("/", 1)[0])
+    if handler:
+        candidate_url = handler(doi)
+        if await verify_pdf_url(candidate_url, session):
+            return candidate_url
 
-    doi_url = f"https://doi.org/{quote_plus(doi)}"
+    doi_url = f"https://doi.org/{quote(doi, safe='/')}"
 
     try:
-        # make a request to the DOI URL
-        r1 = session.get(doi_url, timeout=15, allow_redirects=True)
-        r1.raise_for_status()
-        html = r1.text
-        
-        # Method 1: Check if PDF URL is embedded in JSON or JavaScript
-        pdf_url_patterns = [
-            r'"pdfUrl"\s*:\s*"([^"]+)"',
-            r'"pdf_url"\s*:\s*"([^"]+)"',
-            r'"downloadUrl"\s*:\s*"([^"]+\.pdf[^"]*)"',
-            r'pdfUrl\s*=\s*["\']([^"\']+)["\']',
-            r'pdf_link\s*=\s*["\']([^"\']+\.pdf[^"\']*)["\']'
-        ]
-        
-        for pattern in pdf_url_patterns:
-            match = re.search(pattern, html, re.I)
-            if match:
-                import html as html_module
-                pdf_url = html_module.unescape(match.group(1))
-                candidate_url = urljoin(r1.url, pdf_url)
-                if is_pdf_link(candidate_url):
-                    return candidate_url
+        # resolve the DOI with a HEAD first: if it redirects straight to a
+        # PDF we can skip downloading and parsing the landing page entirely
+        async with session.head(doi_url, timeout=aiohttp.ClientTimeout(total=10), allow_redirects=True) as head:
+            if "pdf" in head.headers.get("Content-Type", "").lower():
+                return str(head.url)
+            landing_url = str(head.url)
+
+        # fetch the landing page from the already-resolved URL so the
+        # redirect chain isn't walked a second time
+        async with session.get(landing_url or doi_url, timeout=aiohttp.ClientTimeout(total=15)) as r1:
+            r1.raise_for_status()
+            body = await r1.read()
+            encoding = r1.get_encoding()
+            r1_url = str(r1.url)
+            r1_content_type = r1.headers.get("Content-Type", "")
+
+        # Method 1: Check if PDF URL is embedded in JSON or JavaScript,
+        # scanning the raw bytes so a hit never pays for the page decode
+        match = PDF_JSON_RE.search(body)
+        if match:
+            embedded = next(g for g in match.groups() if g)
+            pdf_url = html_module.unescape(embedded.decode(encoding, "replace"))
+            candidate_url = urljoin(r1_url, pdf_url)
+            if is_pdf_link(candidate_url):
+                return candidate_url
 
         # Method 2: Check if the response itself is a PDF
-        if "application/pdf" in r1.headers.get("Content-Type", ""):
-            return r1.url
-        
-        soup1 = BeautifulSoup(r1.text, "html.parser")
+        if "application/pdf" in r1_content_type:
+            return r1_url
+
+        html = body.decode(encoding, "replace")
+        tree1 = LexborHTMLParser(html)
 
         # Method 3: Look for direct PDF links in the HTML
-        pdf_url = find_pdf_link(soup1, r1.url)
+        pdf_url = find_pdf_link(tree1, r1_url)
         if pdf_url:
             # Verify the PDF URL before returning it
-            if verify_pdf_url(pdf_url, session):
+            if await verify_pdf_url(pdf_url, session):
                 return pdf_url
             else:
-                print(f"  PDF URL verification failed for {pdf_url}")
-        
+                logger.warning(f"  PDF URL verification failed for {pdf_url}")
+
         # Method 4: Try multiple intermediate page strategies
-        intermediate_links = find_intermediate_pdf_page(soup1)
-        
+        intermediate_links = find_intermediate_pdf_page(tree1)
+
         if intermediate_links:
-            inter_url = urljoin(r1.url, intermediate_links)
+            inter_url = urljoin(r1_url, intermediate_links)
             try:
-                r2 = session.get(inter_url, timeout=15, allow_redirects=True)
-                r2.raise_for_status()
+                async with session.get(inter_url, timeout=aiohttp.ClientTimeout(total=15)) as r2:
+                    r2.raise_for_status()
+
+                    # Check if intermediate page directly serves PDF
+                    if "application/pdf" in r2.headers.get("Content-Type", ""):
+                        return str(r2.url)
 
-                # Check if intermediate page directly serves PDF
-                if "application/pdf" in r2.headers.get("Content-Type", ""):
-                    return r2.url
+                    inter_html = await r2.text()
+                    r2_url = str(r2.url)
 
-                soup2 = BeautifulSoup(r2.text, "html.parser")
-                pdf_url = find_pdf_link(soup2, r2.url)
-                if pdf_url and verify_pdf_url(pdf_url, session):
+                tree2 = LexborHTMLParser(inter_html)
+                pdf_url = find_pdf_link(tree2, r2_url)
+                if pdf_url and await verify_pdf_url(pdf_url, session):
                     return pdf_url
-            except requests.exceptions.RequestException:
+            except (aiohttp.ClientError, asyncio.TimeoutError):
                 pass  # Continue to next method
-        
+
         # Method 5: Try common PDF endpoint patterns
-        base_domain = f"{urlparse(r1.url).scheme}://{urlparse(r1.url).netloc}"
+        parsed = urlparse(r1_url)
+        base_domain = f"{parsed.scheme}://{parsed.netloc}"
         common_pdf_paths = [
             f"/pdf/{doi}",
-            f"/pdf/{doi}.pdf", 
+            f"/pdf/{doi}.pdf",
             f"/article/pdf/{doi}",
             f"/content/pdf/{doi}.pdf",
             f"/download/pdf/{doi}",
             f"/full/{doi}.pdf"
         ]
-        
-        for path in common_pdf_paths:
-            try:
-                test_url = base_domain + path
-                if verify_pdf_url(test_url, session):
-                    return test_url
-            except requests.exceptions.RequestException:
-                continue
-        
+
+        # probe all candidate paths concurrently and take the first hit
+        # in priority order: one round-trip of wall-clock instead of six
+        test_urls = [base_domain + path for path in common_pdf_paths]
+        probes = await asyncio.gather(
+            *(verify_pdf_url(test_url, session) for test_url in test_urls)
+        )
+        for test_url, is_pdf in zip(test_urls, probes):
+            if is_pdf:
+                return test_url
+
     # handle various request exceptions
-    except requests.exceptions.HTTPError as e:
-        print(f"HTTP error while fetching PDF for DOI {doi}: {e}")
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching PDF for DOI {doi}: {e}")
-    
+    except aiohttp.ClientResponseError as e:
+        logger.warning(f"HTTP error while fetching PDF for DOI {doi}: {e}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"Error fetching PDF for DOI {doi}: {e}")
+
     return None
 
 
-def try_alternative_sources(doi: str, session: requests.Session) -> str:
-    """
-    Try alternative sources for PDF access.
-    :param doi: DOI of the paper
-    :param session: requests session to use
-    :return: URL of the PDF if found, otherwise None
-    """
-    # Try arXiv if it's an arXiv paper
-    if "arxiv" in doi.lower():
-        arxiv_id = doi.split("/")[-1] if "/" in doi else doi
-        arxiv_pdf_url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
-        if verify_pdf_url(arxiv_pdf_url, session):
-            return arxiv_pdf_url
-    
-    # Try bioRxiv/medRxiv patterns
-    for preprint_server in ["biorxiv", "medrxiv"]:
-        if preprint_server in doi.lower():
-            try:
-                # Extract the paper ID and construct direct PDF URL
-                parts = doi.split("/")
-                if len(parts) >= 2:
-                    paper_id = parts[-1]
-                    pdf_url = f"https://www.{preprint_server}.org/content/10.1101/{paper_id}v1.full.pdf"
-                    if verify_pdf_url(pdf_url, session):
-                        return pdf_url
-            except requests.exceptions.RequestException:
-                pass
-    
-    return None
+# one scan detects which preprint server (if any) a DOI belongs to,
+# replacing the per-server substring tests and repeated .lower() calls
+_ALT_SOURCE_RE = re.compile(r"arxiv|biorxiv|medrxiv", re.I)
+
+# PDF URL template per preprint server, formatted with the captured id
+_ALT_SOURCE_TEMPLATES = {
+    "arxiv": "https://arxiv.org/pdf/{id}.pdf",
+    "biorxiv": "https://www.biorxiv.org/content/10.1101/{id}v1.full.pdf",
+    "medrxiv": "https://www.medrxiv.org/content/10.1101/{id}v1.full.pdf",
+}
 
-def get_pdf_url(doi: str) -> str:
+async def try_alternative_sources(doi: str, session: aiohttp.ClientSession) -> str:
     """
-    Get the PDF URL for a given DOI using the Unpaywall API.
+    Try alternative sources (preprint servers) for PDF access.
     :param doi: DOI of the paper
-    :return: URL of the PDF if available, otherwise None
+    :param session: aiohttp session to use
+    :return: URL of the PDF if found, otherwise None
     """
-    try:
-        # construct the Unpaywall API URL with the DOI
-        url = f"https://api.unpaywall.org/v2/{quote_plus(doi)}"
-        params = {"email": UNPAYWALL_EMAIL}
-
-        # make a request to the Unpaywall API
-        r = requests.get(url, params=params, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-
-        # check if the best OA location is available and return its PDF URL
-        oa = data.get("best_oa_location")
-        return oa.get("url_for_pdf") if oa else None
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching PDF URL from Unpaywall for DOI {doi}: {e}")
+    match = _ALT_SOURCE_RE.search(doi)
+    if not match:
         return None
 
+    # the paper id is the last path segment, or the whole DOI if there
+    # is no slash (bare arXiv ids)
+    template = _ALT_SOURCE_TEMPLATES[match.group(0).lower()]
+    pdf_url = template.format(id=doi.rsplit("/", 1)[-1])
+    if await verify_pdf_url(pdf_url, session):
+        return pdf_url
+
+    return None
+
 def is_valid_pdf(file_path: str) -> bool:
     """
     Check if the downloaded file is a valid PDF by checking its header and basic structure.
     :param file_path: Path to the file to check
     :return: True if it's a valid PDF, False otherwise
     """
+    # positioned reads against a raw fd: fstat gives the size and two
+    # preads fetch the header and trailer with no file object, no
+    # buffering layer and no seek/tell round-trips in between
     try:
-        with open(file_path, "rb") as f:
-            # Check PDF header
-            header = f.read(8)
-            if not header.startswith(b'%PDF-'):
-                return False
-            
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
             # Check file size - PDFs should be at least a few hundred bytes
-            f.seek(0, 2)  # Seek to end
-            file_size = f.tell()
+            file_size = os.fstat(fd).st_size
             if file_size < 100:  # Too small to be a valid PDF
                 return False
-            
+
+            # Check PDF header
+            if not os.pread(fd, 8, 0).startswith(b'%PDF-'):
+                return False
+
             # Check for PDF trailer (basic structure validation)
-            f.seek(max(0, file_size - 1024))  # Read last 1KB
-            trailer_content = f.read()
+            trailer_content = os.pread(fd, 1024, max(0, file_size - 1024))
             if b'%%EOF' not in trailer_content and b'trailer' not in trailer_content:
                 return False
-            
+
             return True
+        finally:
+            os.close(fd)
     except Exception as e:
-        print(f"Error validating PDF {file_path}: {e}")
+        logger.warning(f"Error validating PDF {file_path}: {e}")
         return False
 
 def is_html_content(content_bytes: bytes) -> bool:
@@ -391,86 +602,159 @@ def is_html_content(content_bytes: bytes) -> bool:
     :return: True if content appears to be HTML
     """
     # Check for common HTML indicators
-    html_indicators = [b'<!DOCTYPE', b'<html', b'<HTML', b'<head', b'<HEAD', b'<body', b'<BODY']
     content_lower = content_bytes.lower()
-    return any(indicator in content_lower for indicator in html_indicators)
+    return any(indicator in content_lower for indicator in HTML_INDICATORS)
 
-def download_pdf(doi: str, pdf_url: str):
+async def download_pdf(doi: str, pdf_url: str, session: aiohttp.ClientSession) -> bool:
     """
     Download the PDF from the given URL and save it to the output directory.
     :param doi: DOI of the paper
     :param pdf_url: URL of the PDF to download
+    :param session: aiohttp session to use
+    :return: True if a valid PDF was saved, False otherwise
     """
     # create a safe filename by replacing slashes in the DOI
     safe_name = doi.replace("/", "_")
     output_path = os.path.join(OUTPUT_DIR, f"{safe_name}.pdf")
-    
+    # chunks stream to a .part file and are renamed into place only when
+    # the download validates, so a crash mid-write can never leave a
+    # truncated .pdf behind and the file is never held whole in memory
+    tmp_path = output_path + ".part"
+
     try:
-        with requests.get(pdf_url, stream=True, timeout=20) as r:
-            r.raise_for_status()
-            
-            # Check if the response is actually a PDF
-            content_type = r.headers.get("Content-Type", "").lower()
-            if "application/pdf" not in content_type and "pdf" not in content_type:
-                print(f"Warning: Content-Type is '{content_type}' for {doi}, may not be a PDF")
-            
-            # Read first chunk to check if it's HTML instead of PDF
-            first_chunk = None
-            content_written = 0
-            
-            with open(output_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    if first_chunk is None:
-                        first_chunk = chunk
-                        # Check if the response is HTML instead of PDF
-                        if is_html_content(chunk):
-                            print(f"Error: Received HTML content instead of PDF for {doi}")
-                            return
-                    
-                    f.write(chunk)
-                    content_written += len(chunk)
-            
-            # Check if we got a reasonable amount of content
-            if content_written < 1000:  # Less than 1KB is suspicious for a PDF
-                os.remove(output_path)
-                print(f"Error: Downloaded file for {doi} is too small ({content_written} bytes), likely not a valid PDF")
-                return
-            
-            # Validate that the downloaded file is actually a PDF
-            if is_valid_pdf(output_path):
-                global PDF_COUNTER
-                PDF_COUNTER += 1
-                print(f"Downloaded {doi} ({content_written} bytes)")
-            else:
-                os.remove(output_path)  # Remove invalid file
-                print(f"Downloaded file for {doi} is not a valid PDF, removed")
-                return
-            
-    except requests.exceptions.HTTPError as e:
-        print(f"Error downloading {doi}: {e}")
-        return
-    except requests.exceptions.ConnectionError as e:
-        print(f"Connection error while downloading {doi}: {e}")
-        return
-    except requests.exceptions.Timeout as e:
-        print(f"Max retries exceeded while downloading {doi}: {e}")
-        return
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred while downloading {doi}: {e}")
-        return
+        # bound concurrent downloads against the same host
+        async with _host_sems[urlparse(pdf_url).netloc]:
+            async with session.get(
+                pdf_url, timeout=aiohttp.ClientTimeout(total=60),
+                headers={"Accept": "application/pdf"},
+            ) as r:
+                r.raise_for_status()
+
+                # Check if the response is actually a PDF
+                content_type = r.headers.get("Content-Type", "").lower()
+                if "application/pdf" not in content_type and "pdf" not in content_type:
+                    logger.warning(f"Warning: Content-Type is '{content_type}' for {doi}, may not be a PDF")
+
+                # reject absurdly large files before pulling any body
+                content_length = r.headers.get("Content-Length")
+                if content_length and int(content_length) > 500 * 1024 * 1024:
+                    logger.warning(f"Error: Content-Length {content_length} for {doi} exceeds 500 MB, skipping")
+                    return False
+
+                # stream the body to disk in 1 MiB blocks through
+                # aiofiles, so neither network nor disk I/O blocks the
+                # loop and the file never sits whole in memory; the
+                # first chunk is inspected in-flight so HTML error
+                # pages and non-PDFs never get fully downloaded, and a
+                # rolling tail keeps the last KiB for the trailer check
+                # even when the final chunk is short
+                content_written = 0
+                tail = b""
+                async with aiofiles.open(tmp_path, "wb") as f:
+                    async for chunk in r.content.iter_chunked(1024 * 1024):
+                        if content_written == 0:
+                            if is_html_content(chunk):
+                                logger.warning(f"Error: Received HTML content instead of PDF for {doi}")
+                                return False
+                            if not chunk.startswith(b'%PDF-'):
+                                logger.warning(f"Error: Response for {doi} is missing the PDF magic bytes")
+                                return False
+                        await f.write(chunk)
+                        content_written += len(chunk)
+                        tail = (tail + chunk)[-1024:]
+
+        if content_written == 0:
+            logger.warning(f"Error: Empty response for {doi}")
+            return False
+
+        # Check if we got a reasonable amount of content
+        if content_written < 1000:  # Less than 1KB is suspicious for a PDF
+            logger.warning(f"Error: Downloaded file for {doi} is too small ({content_written} bytes), likely not a valid PDF")
+            return False
+
+        # Validate the trailer from the rolling tail before the rename
+        if b'%%EOF' not in tail and b'trailer' not in tail:
+            logger.warning(f"Downloaded file for {doi} is not a valid PDF, discarded")
+            return False
+
+        # rename into place in a worker thread, off the event loop
+        await asyncio.to_thread(os.replace, tmp_path, output_path)
+        logger.info(f"Downloaded {doi} ({content_written} bytes)")
+        return True
+
+    except aiohttp.ClientResponseError as e:
+        logger.warning(f"Error downloading {doi}: {e}")
+        return False
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"An error occurred while downloading {doi}: {e}")
+        return False
+    finally:
+        # any early return or exception leaves the .part file behind;
+        # a successful rename already removed it
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
 
 def clear_pdfs():
     """
     Clear all PDF files from the output directory. Does not delete .gitkeep
     """
-    for filename in os.listdir(OUTPUT_DIR):
-        file_path = os.path.join(OUTPUT_DIR, filename)
-        if os.path.isfile(file_path) and filename != ".gitkeep":
-            os.remove(file_path)
+    # scandir's cached dirent type info avoids the extra stat per file
+    # that os.path.isfile would re-issue
+    with os.scandir(OUTPUT_DIR) as entries:
+        paths = [
+            entry.path for entry in entries
+            if entry.name != ".gitkeep" and entry.is_file(follow_symlinks=False)
+        ]
+    # each unlink targets a distinct inode and releases the GIL, so a
+    # small thread pool overlaps them instead of paying the syscall
+    # latency serially across a big batch
+    if paths:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(os.unlink, paths))
+
+async def fetch_one(index: int, total: int, doi: str, session: aiohttp.ClientSession,
+                    sem: asyncio.Semaphore) -> bool:
+    """
+    Resolve and download the PDF for a single DOI.
+    :param index: position of the DOI in the input list (for logging)
+    :param total: total number of DOIs being processed
+    :param doi: DOI of the paper
+    :param session: aiohttp session to use
+    :param sem: semaphore bounding concurrently processed DOIs
+    :return: True if a valid PDF was saved, False otherwise
+    """
+    async with sem:
+        logger.info(f"[{index}/{total}] Processing DOI: {doi}")
+
+        # Method 1: Try the open-access API cascade first
+        found = await sources.try_sources(doi, session)
+        if found:
+            pdf_url, source_name = found
+            logger.info(f"  Found PDF via {source_name}: {pdf_url}")
+            # Verify the URL before downloading
+            if await verify_pdf_url(pdf_url, session):
+                return await download_pdf(doi, pdf_url, session)
+            else:
+                logger.warning(f"  {source_name} URL verification failed, trying other methods...")
 
-def main():
+        # Method 2: Try web scraping
+        pdf_url = await web_scrape_pdfs(doi, session)
+        if pdf_url:
+            logger.info(f"  Found PDF via web scraping: {pdf_url}")
+            return await download_pdf(doi, pdf_url, session)
+
+        # Method 3: Try alternative sources
+        pdf_url = await try_alternative_sources(doi, session)
+        if pdf_url:
+            logger.info(f"  Found PDF via alternative source: {pdf_url}")
+            return await download_pdf(doi, pdf_url, session)
+
+        logger.info(f"  No PDF found for DOI: {doi}")
+        return False
+
+async def main_async():
     """
-    Main function to orchestrate the PDF downloading process.
+    Process every DOI concurrently over one pooled aiohttp session.
     """
     # clear the output directory
     clear_pdfs()
@@ -478,47 +762,53 @@ def main():
     with open(INPUT_FILE) as f:
         dois = [line.strip() for line in f if line.strip()]
 
-    print(f"Processing {len(dois)} DOIs...")
-    
-    # iterate over each DOI and fetch the PDF URL
-    for i, doi in enumerate(dois, 1):
-        print(f"\n[{i}/{len(dois)}] Processing DOI: {doi}")
-        
-        session = requests.Session()
-        session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
-        })
-        
-        # Method 1: Try Unpaywall API first
-        pdf_url = get_pdf_url(doi)
-        if pdf_url:
-            print(f"  Found PDF via Unpaywall: {pdf_url}")
-            # Verify the URL before downloading
-            if verify_pdf_url(pdf_url, session):
-                download_pdf(doi, pdf_url)
-                continue
-            else:
-                print(f"  Unpaywall URL verification failed, trying other methods...")
-        
-        # Method 2: Try web scraping
-        pdf_url = web_scrape_pdfs(doi, session=session)
-        if pdf_url:
-            print(f"  Found PDF via web scraping: {pdf_url}")
-            download_pdf(doi, pdf_url)
-            continue
-        
-        # Method 3: Try alternative sources
-        pdf_url = try_alternative_sources(doi, session)
-        if pdf_url:
-            print(f"  Found PDF via alternative source: {pdf_url}")
-            download_pdf(doi, pdf_url)
-            continue
-        
-        print(f"  No PDF found for DOI: {doi}")
+    logger.info(f"Processing {len(dois)} DOIs...")
+
+    # the connector caps total and per-host connections so no single
+    # publisher sees a flood; the semaphore caps DOIs in flight; idle
+    # connections are kept warm for a minute so repeat hits on the same
+    # publisher later in the batch skip the TCP+TLS handshake
+    connector = aiohttp.TCPConnector(
+        limit=128, limit_per_host=8, ttl_dns_cache=300, keepalive_timeout=60
+    )
+    sem = asyncio.Semaphore(CONCURRENT_DOIS)
+
+    async with aiohttp.ClientSession(
+        connector=connector, headers={"User-Agent": USER_AGENT}
+    ) as session:
+        # return_exceptions keeps one crashed DOI from cancelling the
+        # rest of the batch
+        results = await asyncio.gather(*(
+            fetch_one(index, len(dois), doi, session, sem)
+            for index, doi in enumerate(dois, start=1)
+        ), return_exceptions=True)
+
+    downloaded = 0
+    for doi, result in zip(dois, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Warning: unexpected error processing DOI {doi}: {result}")
+        elif result:
+            downloaded += 1
+    logger.info(f"\nDownloaded {downloaded} PDFs out of {len(dois)} DOIs.")
 
-    print(f"\nDownloaded {PDF_COUNTER} PDFs out of {len(dois)} DOIs.")
+def main():
+    """
+    Main function to orchestrate the PDF downloading process.
+    """
+    # log records are queued and written by a listener thread, so the
+    # event loop never blocks on terminal I/O; the handler sits on the
+    # root logger so records from sources.py take the same path
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    try:
+        asyncio.run(main_async())
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
     main()
-    
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+Open-access PDF sources for pdf_grabber, tried in priority order:
+OpenAlex direct PDF URL, Europe PMC fulltext, Unpaywall, then OpenAlex
+alternate locations. Single API hits here are far cheaper than the
+multi-request landing-page scrape, so anything found in the cascade
+skips scraping entirely.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+
+import aiohttp
+from dotenv import load_dotenv
+from urllib.parse import quote
+
+load_dotenv()
+
+# errors propagate to whatever handlers the entry point configured; under
+# pdf_grabber that's the queue-backed listener, so the event loop never
+# blocks on the stdout lock
+logger = logging.getLogger(__name__)
+
+# load environment variables
+MAILTO = os.getenv("MAILTO")
+
+OPENALEX_WORKS = "https://api.openalex.org/works"
+EUROPEPMC_SEARCH = "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
+UNPAYWALL_API = "https://api.unpaywall.org/v2"
+
+# per-source concurrency caps so no single API sees a flood; Unpaywall's
+# published limit is 10 concurrent requests
+_source_sems = {
+    "openalex": asyncio.Semaphore(8),
+    "europepmc": asyncio.Semaphore(8),
+    "unpaywall": asyncio.Semaphore(10),
+}
+
+# on-disk cache of source lookups so repeat runs skip the APIs for known
+# DOIs; an empty pdf_url is a negative marker for a source that has no
+# PDF for that DOI
+CACHE_PATH = "data/pdf_sources_cache.sqlite"
+# entries older than 30 days are refetched
+CACHE_TTL = 30 * 24 * 3600
+
+def _open_cache() -> sqlite3.Connection:
+    """
+    Open (and create if needed) the on-disk source-lookup cache.
+    :return: sqlite3 connection to the cache database
+    """
+    conn = sqlite3.connect(CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS lookups ("
+        "source TEXT, doi TEXT, fetched_at INTEGER, pdf_url TEXT, "
+        "PRIMARY KEY (source, doi))"
+    )
+    return conn
+
+_cache_db = _open_cache()
+
+def _cache_get(source: str, doi: str) -> str:
+    """
+    Look up a cached source result.
+    :param source: name of the source the result came from
+    :param doi: DOI of the paper to look up
+    :return: cached PDF URL ("" for a cached miss), or None if absent/expired
+    """
+    row = _cache_db.execute(
+        "SELECT fetched_at, pdf_url FROM lookups WHERE source = ? AND doi = ?",
+        (source, doi.strip().lower()),
+    ).fetchone()
+    if row is None:
+        return None
+    fetched_at, pdf_url = row
+    # treat stale entries as misses so they get refetched
+    if time.time() - fetched_at > CACHE_TTL:
+        return None
+    return pdf_url
+
+def _cache_put(source: str, doi: str, pdf_url: str):
+    """
+    Store a source result (or a negative marker) in the cache.
+    :param source: name of the source the result came from
+    :param doi: DOI the result belongs to
+    :param pdf_url: PDF URL, or "" to record that none is available
+    """
+    _cache_db.execute(
+        "INSERT OR REPLACE INTO lookups (source, doi, fetched_at, pdf_url) "
+        "VALUES (?, ?, ?, ?)",
+        (source, doi.strip().lower(), int(time.time()), pdf_url),
+    )
+    _cache_db.commit()
+
+async def _fetch_openalex_work(doi: str, session: aiohttp.ClientSession) -> dict:
+    """
+    Fetch the OpenAlex work record for a DOI.
+    :param doi: DOI of the paper
+    :param session: aiohttp session to use
+    :return: work record as a dictionary, or None if unknown/unreachable
+    """
+    url = f"{OPENALEX_WORKS}/https://doi.org/{quote(doi, safe='/')}"
+    async with _source_sems["openalex"]:
+        async with session.get(
+            url, params={"mailto": MAILTO}, timeout=aiohttp.ClientTimeout(total=10)
+        ) as r:
+            if r.status == 404:
+                return None
+            r.raise_for_status()
+            return await r.json()
+
+async def openalex_pdf(doi: str, session: aiohttp.ClientSession) -> str:
+    """
+    Get the best open-access PDF URL OpenAlex knows for a DOI.
+    :param doi: DOI of the paper
+    :param session: aiohttp session to use
+    :return: URL of the PDF if available, otherwise None
+    """
+    work = await _fetch_openalex_work(doi, session)
+    if work is None:
+        return None
+    best = work.get("best_oa_location") or {}
+    return best.get("pdf_url")
+
+async def europepmc_pdf(doi: str, session: aiohttp.ClientSession) -> str:
+    """
+    Get a fulltext PDF URL from Europe PMC for a DOI.
+    :param doi: DOI of the paper
+    :param session: aiohttp session to use
+    :return: URL of the PDF if available, otherwise None
+    """
+    params = {
+        "query": f'DOI:"{doi}"',
+        "resultType": "core",
+        "format": "json",
+        "pageSize": 1,
+    }
+    async with _source_sems["europepmc"]:
+        async with session.get(
+            EUROPEPMC_SEARCH, params=params, timeout=aiohttp.ClientTimeout(total=10)
+        ) as r:
+            r.raise_for_status()
+            data = await r.json()
+
+    results = data.get("resultList", {}).get("result", [])
+    if not results:
+        return None
+    fulltext_urls = results[0].get("fullTextUrlList", {}).get("fullTextUrl", [])
+    for entry in fulltext_urls:
+        if entry.get("documentStyle") == "pdf" and entry.get("url"):
+            return entry["url"]
+    return None
+
+async def unpaywall_pdf(doi: str, session: aiohttp.ClientSession) -> str:
+    """
+    Get the best open-access PDF URL from Unpaywall for a DOI.
+    :param doi: DOI of the paper
+    :param session: aiohttp session to use
+    :return: URL of the PDF if available, otherwise None
+    """
+    url = f"{UNPAYWALL_API}/{quote(doi, safe='/')}"
+    async with _source_sems["unpaywall"]:
+        async with session.get(
+            url, params={"email": MAILTO}, timeout=aiohttp.ClientTimeout(total=10)
+        ) as r:
+            if r.status == 404:
+                return None
+            r.raise_for_status()
+            data = await r.json()
+
+    oa = data.get("best_oa_location")
+    return oa.get("url_for_pdf") if oa else None
+
+async def openalex_lookup(doi: str, session: aiohttp.ClientSession) -> str:
+    """
+    Last-resort OpenAlex lookup: scan every known location for a PDF URL,
+    not just the best open-access one.
+    :param doi: DOI of the paper
+    :param session: aiohttp session to use
+    :return: URL of the PDF if available, otherwise None
+    """
+    work = await _fetch_openalex_work(doi, session)
+    if work is None:
+        return None
+    for location in work.get("locations") or []:
+        if location.get("pdf_url"):
+            return location["pdf_url"]
+    return None
+
+# cascade in priority order: cheap single API hits before anything else
+SOURCES = [
+    ("openalex", openalex_pdf),
+    ("europepmc", europepmc_pdf),
+    ("unpaywall", unpaywall_pdf),
+    ("openalex_locations", openalex_lookup),
+]
+
+async def try_sources(doi: str, session: aiohttp.ClientSession) -> tuple:
+    """
+    Try each PDF source in priority order, short-circuiting on the first
+    hit. Results (including misses) are cached per source.
+    :param doi: DOI of the paper
+    :param session: aiohttp session to use
+    :return: (pdf_url, source_name) tuple, or None if no source has a PDF
+    """
+    for name, source in SOURCES:
+        # serve cached lookups (including cached misses) without a round-trip
+        cached = _cache_get(name, doi)
+        if cached is not None:
+            if cached:
+                return cached, name
+            continue
+
+        try:
+            pdf_url = await source(doi, session)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Error fetching PDF URL from {name} for DOI {doi}: {e}")
+            continue
+
+        _cache_put(name, doi, pdf_url or "")
+        if pdf_url:
+            return pdf_url, name
+
+    return None